@@ -1,180 +1,291 @@
 import streamlit as st
-import json
+import msgpack
+import orjson
 import os
+import re
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+from bisect import bisect_right
+from collections import Counter, defaultdict
 from datetime import datetime
 
-# --- Page Configuration ---
-st.set_page_config(page_title="Library Manager", layout="wide")
-
 # --- Custom CSS with clearer colors over background ---
-custom_css = """
-<style>
-.stApp {
-    background-image: linear-gradient(rgba(255,255,255,0.8), rgba(255,255,255,0.8)),
-                      url('https://images.unsplash.com/photo-1524995997946-a1c2e315a42f');
-    background-size: cover;
-    background-position: center;
-    color: #111 !important;
-    font-family: 'Segoe UI', sans-serif;
-}
-
-h1, h2, h3, h4 {
-    color: #0d306b;
-    font-weight: bold;
-}
-
-.stButton > button {
-    background-color: #1e4fa0;
-    color: white;
-    border-radius: 10px;
-    padding: 0.5em 1em;
-    border: none;
-    font-weight: bold;
-}
-
-.stButton > button:hover {
-    background-color: #173c80;
-}
-
-section[data-testid="stSidebar"] {
-    background-color: rgba(255, 255, 255, 0.95);
-    color: #111;
-    border-right: 2px solid #ddd;
-}
-
-.stRadio > div {
-    background-color: #f1f6fb;
-    padding: 1rem;
-    border-radius: 12px;
-    box-shadow: 0 2px 6px rgba(0,0,0,0.05);
-}
-
-.stMetric {
-    background-color: #f5faff;
-    padding: 1rem;
-    border-radius: 12px;
-    text-align: center;
-    box-shadow: 0 2px 8px rgba(0,0,0,0.03);
-}
-
-footer {
-    visibility: hidden;
-}
-</style>
-"""
-st.markdown(custom_css, unsafe_allow_html=True)
+CSS_FILE = "style.css"
+
+@st.cache_data
+def custom_css():
+    with open(CSS_FILE) as file:
+        return file.read()
 
 # --- File Setup ---
-DATA_FILE = "library.txt"
+DATA_FILE = "library.msgpack"
+NDJSON_FILE = "library.ndjson"
+LEGACY_FILE = "library.txt"
+
+def library_mtime():
+    return os.path.getmtime(DATA_FILE) if os.path.exists(DATA_FILE) else 0
 
-def load_library():
+@st.cache_data
+def load_library(mtime):
+    if not os.path.exists(DATA_FILE):
+        # One-shot migration from the older JSON formats.
+        if os.path.exists(NDJSON_FILE):
+            with open(NDJSON_FILE, "rb") as file:
+                save_library([orjson.loads(line) for line in file])
+        elif os.path.exists(LEGACY_FILE):
+            with open(LEGACY_FILE, "rb") as file:
+                save_library(orjson.loads(file.read()))
     if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as file:
-            return json.load(file)
+        with open(DATA_FILE, "rb") as file:
+            return list(msgpack.Unpacker(file, raw=False))
     return []
 
 def save_library(library):
-    with open(DATA_FILE, "w") as file:
-        json.dump(library, file, indent=4)
-
-library = load_library()
-
-# --- Title ---
-st.title("📚 Library Management System")
-st.markdown("""
-Effortlessly manage your collection of books. Add, remove, search, or analyze your library in one place.
-""")
-
-# --- Sidebar Menu ---
-menu = ["Add Book", "Remove Book", "Search Book", "Display All Books", "Display Statistics", "Exit"]
-choice = st.sidebar.radio("📌 Menu", menu)
-
-# --- Add Book ---
-if choice == "Add Book":
-    st.subheader("➕ Add a New Book")
-    title = st.text_input("Book Title")
-    author = st.text_input("Author")
-    year = st.number_input("Publication Year", min_value=1900, max_value=2100, step=1)
-    genre = st.text_input("Genre")
-    read_status = st.checkbox("Mark as Read")
-
-    if st.button("Add Book"):
-        if title and author and genre:
-            new_book = {
-                "Title": title,
-                "Author": author,
-                "Year": int(year),
-                "Genre": genre,
-                "Read": read_status
-            }
-            library.append(new_book)
-            save_library(library)
-            st.success(f"✅ Book '{title}' added!")
-        else:
-            st.warning("⚠️ Please fill in all the fields.")
+    # Stream one book at a time through a single reused Packer, so a
+    # full rewrite never holds more than one serialized book in memory.
+    packer = msgpack.Packer()
+    with open(DATA_FILE, "wb") as file:
+        for book in library:
+            file.write(packer.pack(book))
+    load_library.clear()
+    lowered.clear()
+    soa.clear()
+    by_year.clear()
+    title_index.clear()
+    library_frame.clear()
+    search_buffer.clear()
+    title_counter.clear()
 
-# --- Remove Book ---
-elif choice == "Remove Book":
-    st.subheader("❌ Remove a Book")
-    remove_title = st.text_input("Enter the book title to remove")
+def append_book(book):
+    # Adding a book is a single O(1) append, not a full rewrite.
+    with open(DATA_FILE, "ab") as file:
+        file.write(msgpack.packb(book))
+    load_library.clear()
+    lowered.clear()
+    soa.clear()
+    by_year.clear()
+    title_index.clear()
+    library_frame.clear()
+    search_buffer.clear()
+    title_counter.clear()
 
-    if st.button("Remove Book"):
-        initial_count = len(library)
-        library = [book for book in library if book["Title"].lower() != remove_title.lower()]
-        save_library(library)
-        if len(library) < initial_count:
-            st.success(f"✅ Book '{remove_title}' removed.")
+@st.cache_data
+def lowered(mtime):
+    # Parallel arrays of lowercase titles/authors so Search doesn't
+    # re-lowercase every book on each keystroke.
+    return [(book["Title"].lower(), book["Author"].lower()) for book in load_library(mtime)]
+
+@st.cache_data
+def soa(mtime):
+    # Struct-of-arrays view of the library: statistics reduce over these
+    # with NumPy instead of looping over dicts.
+    books = load_library(mtime)
+    years = np.fromiter((book["Year"] for book in books), dtype=int, count=len(books))
+    read = np.fromiter((book["Read"] for book in books), dtype=bool, count=len(books))
+    return years, read
+
+@st.cache_data
+def by_year(mtime):
+    # Buckets of book positions per publication year, so a year filter
+    # is a dict lookup instead of a scan.
+    buckets = defaultdict(list)
+    for position, book in enumerate(load_library(mtime)):
+        buckets[book["Year"]].append(position)
+    return buckets
+
+@st.cache_data
+def title_index(mtime):
+    # Hash lookup from lowercase title to book positions, so Remove
+    # doesn't linearly scan the library.
+    index = defaultdict(list)
+    for position, book in enumerate(load_library(mtime)):
+        index[book["Title"].lower()].append(position)
+    return index
+
+@st.cache_data
+def library_frame(mtime):
+    return pd.DataFrame(load_library(mtime))
+
+@st.cache_data
+def search_buffer(mtime):
+    # One contiguous lowercase "title\tauthor" line per book; a single
+    # scan over it replaces a substring search per book.
+    lines = [f"{title}\t{author}" for title, author in lowered(mtime)]
+    offsets = []
+    position = 0
+    for line in lines:
+        offsets.append(position)
+        position += len(line) + 1
+    return "\n".join(lines), offsets
+
+@st.cache_data
+def title_counter(mtime):
+    return Counter(book["Title"] for book in load_library(mtime))
+
+@st.cache_resource
+def pie_fig(items):
+    fig, ax = plt.subplots()
+    ax.pie([count for _, count in items], labels=[title for title, _ in items], autopct="%1.1f%%")
+    ax.set_title("Books by Title")
+    return fig
+
+@st.cache_resource
+def read_bar_fig(read_books, unread_books):
+    fig, ax = plt.subplots()
+    sns.barplot(x=["Read", "Unread"], y=[read_books, unread_books], ax=ax)
+    ax.set_title("Read vs Unread")
+    return fig
+
+
+# --- App Entrypoint ---
+def main():
+    st.set_page_config(page_title="Library Manager", layout="wide")
+    st.markdown(f"<style>{custom_css()}</style>", unsafe_allow_html=True)
+
+    if "dirty" not in st.session_state:
+        st.session_state.dirty = False
+    if "pending_adds" not in st.session_state:
+        st.session_state.pending_adds = []
+
+    # Load from disk only on the first run of the session; afterwards the
+    # list lives in session state and mutations keep it current.
+    if "library" not in st.session_state:
+        st.session_state.library = load_library(library_mtime())
+    library = st.session_state.library
+
+    # --- Title ---
+    st.title("📚 Library Management System")
+    st.markdown("Effortlessly manage your collection of books. Add, remove, search, or analyze your library in one place.")
+
+    # --- Sidebar Menu ---
+    menu = ["Add Book", "Remove Book", "Search Book", "Display All Books", "Display Statistics", "Exit"]
+    choice = st.sidebar.radio("📌 Menu", menu)
+
+    # --- Add Book ---
+    if choice == "Add Book":
+        st.subheader("➕ Add a New Book")
+        title = st.text_input("Book Title")
+        author = st.text_input("Author")
+        year = st.number_input("Publication Year", min_value=1900, max_value=2100, step=1)
+        genre = st.text_input("Genre")
+        read_status = st.checkbox("Mark as Read")
+
+        if st.button("Add Book"):
+            if title and author and genre:
+                new_book = {
+                    "Title": title,
+                    "Author": author,
+                    "Year": int(year),
+                    "Genre": genre,
+                    "Read": read_status
+                }
+                library.append(new_book)
+                st.session_state.pending_adds.append(new_book)
+                st.success(f"✅ Book '{title}' added!")
+            else:
+                st.warning("⚠️ Please fill in all the fields.")
+
+    # --- Remove Book ---
+    elif choice == "Remove Book":
+        st.subheader("❌ Remove a Book")
+        remove_title = st.text_input("Enter the book title to remove")
+
+        if st.button("Remove Book"):
+            matches = set(title_index(library_mtime()).get(remove_title.lower(), []))
+            if matches:
+                library = [book for position, book in enumerate(library) if position not in matches]
+                st.session_state.library = library
+                st.session_state.dirty = True
+                st.success(f"✅ Book '{remove_title}' removed.")
+            else:
+                st.warning("⚠️ Book not found.")
+
+    # --- Search Book ---
+    elif choice == "Search Book":
+        st.subheader("🔍 Search for a Book")
+        search_query = st.text_input("Enter title or author")
+        year_filter = st.number_input("Filter by Publication Year (optional)", min_value=1900, max_value=datetime.now().year, step=1, value=1900)
+
+        if search_query or year_filter > 1900:
+            query = search_query.lower()
+            year = year_filter if year_filter > 1900 else None
+            if year is not None:
+                rows = by_year(library_mtime()).get(year, [])
+                if query:
+                    pairs = lowered(library_mtime())
+                    rows = [row for row in rows if query in pairs[row][0] or query in pairs[row][1]]
+            elif query:
+                buffer, offsets = search_buffer(library_mtime())
+                pattern = re.compile(re.escape(query))
+                rows = sorted({bisect_right(offsets, match.start()) - 1 for match in pattern.finditer(buffer)})
+            else:
+                rows = range(len(library))
+            results = [library[row] for row in rows]
+            if results:
+                st.success(f"🔎 Found {len(results)} result(s):")
+                st.dataframe(pd.DataFrame(results), use_container_width=True)
+            else:
+                st.warning("❌ No matching books found.")
+
+    # --- Display All Books ---
+    elif choice == "Display All Books":
+        st.subheader("📖 All Books in the Library")
+        if library:
+            page_size = 50
+            total_pages = (len(library) + page_size - 1) // page_size
+            page = st.number_input("Page", min_value=1, max_value=total_pages, step=1, value=1)
+            start = (page - 1) * page_size
+            st.dataframe(library_frame(library_mtime()).iloc[start:start + page_size], use_container_width=True)
+            st.caption(f"{len(library)} book(s) — page {page} of {total_pages}")
         else:
-            st.warning("⚠️ Book not found.")
-
-# --- Search Book ---
-elif choice == "Search Book":
-    st.subheader("🔍 Search for a Book")
-    search_query = st.text_input("Enter title or author")
-    year_filter = st.number_input("Filter by Publication Year (optional)", min_value=1900, max_value=datetime.now().year, step=1, value=1900)
-
-    if search_query or year_filter > 1900:
-        results = [
-            book for book in library
-            if (search_query.lower() in book["Title"].lower() or search_query.lower() in book["Author"].lower())
-            and (book["Year"] == year_filter if year_filter > 1900 else True)
-        ]
-        if results:
-            st.success(f"🔎 Found {len(results)} result(s):")
-            for book in results:
-                st.json(book)
+            st.info("📂 No books found. Start adding some!")
+
+    # --- Display Statistics ---
+    elif choice == "Display Statistics":
+        st.subheader("📊 Library Statistics")
+        if not library:
+            st.warning("📂 No books to show statistics.")
         else:
-            st.warning("❌ No matching books found.")
-
-# --- Display All Books ---
-elif choice == "Display All Books":
-    st.subheader("📖 All Books in the Library")
-    if library:
-        for idx, book in enumerate(library, start=1):
-            st.markdown(f"**Book {idx}:**")
-            st.json(book)
-    else:
-        st.info("📂 No books found. Start adding some!")
-
-# --- Display Statistics ---
-elif choice == "Display Statistics":
-    st.subheader("📊 Library Statistics")
-    if not library:
-        st.warning("📂 No books to show statistics.")
-    else:
-        total_books = len(library)
-        read_books = sum([1 for book in library if book["Read"]])
-        unread_books = total_books - read_books
-        read_percentage = (read_books / total_books) * 100
-
-        col1, col2, col3 = st.columns(3)
-        col1.metric("Total Books", total_books)
-        col2.metric("Books Read", read_books)
-        col3.metric("Read %", f"{read_percentage:.2f}%")
-
-# --- Exit App ---
-elif choice == "Exit":
-    st.subheader("👋 Exit")
-    st.info("Thanks for using the Library Management System!")
-    if st.button("Close the App"):
-        st.stop()
+            years, read = soa(library_mtime())
+            total_books = len(library)
+            read_books = int(read.sum())
+            unread_books = total_books - read_books
+            read_percentage = float(read.mean()) * 100
+
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Total Books", total_books)
+            col2.metric("Books Read", read_books)
+            col3.metric("Read %", f"{read_percentage:.2f}%")
+            st.caption(f"Publication years {years.min()}–{years.max()}")
+
+            counts = title_counter(library_mtime())
+
+            chart1, chart2 = st.columns(2)
+            with chart1:
+                st.pyplot(pie_fig(tuple(counts.items())))
+            with chart2:
+                st.pyplot(read_bar_fig(read_books, unread_books))
+
+    # --- Exit App ---
+    elif choice == "Exit":
+        st.subheader("👋 Exit")
+        st.info("Thanks for using the Library Management System!")
+        if st.button("Close the App"):
+            st.stop()
+
+    # --- Persistence ---
+    # Write at most once per run, and only when a real mutation happened;
+    # navigating menus never touches the file.
+    if st.session_state.dirty:
+        save_library(library)
+        st.session_state.dirty = False
+        st.session_state.pending_adds.clear()
+    elif st.session_state.pending_adds:
+        for book in st.session_state.pending_adds:
+            append_book(book)
+        st.session_state.pending_adds.clear()
+
+if __name__ == "__main__":
+    main()